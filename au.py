@@ -1,23 +1,170 @@
 import numpy as np
 import datetime
+import functools
+
+
+def _meeus(dates, doy):
+
+    """
+    Function to calculate Earth-Sun distance from the Julian 
+    date, Meeus J (1998). Days of year are not used.
+
+    Params
+    ------
+    dates : numpy.ndarray
+        1D array of dates (numpy.datetime64[s]).
+
+    doy : numpy.ndarray
+        1D array of days of year, same shape as dates.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+
+    days = dates.astype("datetime64[D]")
+    months = dates.astype("datetime64[M]")
+
+    year = dates.astype("datetime64[Y]").astype(int) + 1970
+    month = months.astype(int) % 12 + 1
+    day = (days - months).astype(int) + 1
+    ut = (dates - days).astype(int) / 3600
+
+    # january and february count as months 13 and 14 
+    # of the previous year
+    early = month <= 2
+    year = np.where(early, year - 1, year)
+    month = np.where(early, month + 12, month)
+
+    a = np.trunc(year/100)
+    b = 2 - a + np.trunc(a/4)
+
+    jd = np.trunc(365.25 * (year + 4716)) + np.trunc(30.6001 * (month + 1)) \
+        + day + (ut/24.0) + b - 1524.5
+    d = jd - 2451545.0
+    g = np.radians(357.529 + 0.98560028 * d)
+
+    return 1.00014 - 0.01671 * np.cos(g) - 0.00014 * np.cos(2*g)
+
+
+def _spencer(dates, doy):
+
+    """
+    Function to calculate Earth-Sun distance from the day of 
+    year, Spencer JW (1971).
+
+    Params
+    ------
+    dates : numpy.ndarray
+        1D array of dates (numpy.datetime64[s]).
+
+    doy : numpy.ndarray
+        1D array of days of year, same shape as dates.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+
+    p = 2 * np.pi * (doy - 1) / 365
+    return (1/(1.000110 + 0.034221 * np.cos(p) + 0.001280 * np.sin(p) \
+        + 0.000719 * np.cos(2 * p) + 0.000077 * np.sin(2 * p)))**0.5
+
+
+def _mather(dates, doy):
+
+    """
+    Function to calculate Earth-Sun distance from the day of 
+    year, Mather PM (2005).
+
+    Params
+    ------
+    dates : numpy.ndarray
+        1D array of dates (numpy.datetime64[s]).
+
+    doy : numpy.ndarray
+        1D array of days of year, same shape as dates.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+
+    return 1/(1 - 0.016729 * np.cos(0.9856 * (doy - 4)))
+
+
+def _esa(dates, doy):
+
+    """
+    Function to calculate Earth-Sun distance from the day of 
+    year, ESA.
+
+    Params
+    ------
+    dates : numpy.ndarray
+        1D array of dates (numpy.datetime64[s]).
+
+    doy : numpy.ndarray
+        1D array of days of year, same shape as dates.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+
+    return 1 - 0.016729 * np.cos((2 * np.pi) * (0.9856 * (doy - 4) / 360))
+
+
+def _duffie(dates, doy):
+
+    """
+    Function to calculate Earth-Sun distance from the day of 
+    year, Duffie JA, Beckman WA (2013).
+
+    Params
+    ------
+    dates : numpy.ndarray
+        1D array of dates (numpy.datetime64[s]).
+
+    doy : numpy.ndarray
+        1D array of days of year, same shape as dates.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+
+    return 1 + 0.033 * np.cos(doy * 2 * np.pi / 365)
+
+
+# Earth-Sun distance formulas, keyed by name
+_FORMULAS = {
+    "Meeus": _meeus,
+    "Spencer": _spencer,
+    "Mather": _mather,
+    "ESA": _esa,
+    "Duffie": _duffie,
+}
 
 
 def earth_sun_dist(date, formula="Meeus"):
 
     """
     Function to calculate Earth-Sun distance for a given
-    date. Earth-Sun distance will be expressed in terms
-    of astronomical units or AU (mean distance from the center 
-    of the Earth to the center of the sun).
+    date or array of dates. Earth-Sun distance will be expressed 
+    in terms of astronomical units or AU (mean distance from the 
+    center of the Earth to the center of the sun).
 
     Params
     ------
-    date : datetime.datetime
-        datetime object
+    date : datetime.datetime or numpy.ndarray
+        datetime object, or numpy.datetime64 scalar or array.
 
-    formula : str
+    formula : str or callable
         String indicating which formula to use. Default is Meeus.
-        Can be either Meeus, Spencer, Mather, ESA, or Duffie.
+        Can be either Meeus, Spencer, Mather, ESA, or Duffie. A
+        custom formula can be passed as a callable taking arrays
+        of dates (numpy.datetime64) and days of year.
 
         Meeus: Meeus J (1998) Astronomical algorithms, 2nd Ed.
         Richmond, VA: Willmann-Bell. And DigitalGlobe
@@ -36,51 +183,87 @@ def earth_sun_dist(date, formula="Meeus"):
         Processes. Wiley: Hoboken, New Jersey, ISBN: 978-0-470-87366-3,
         https://eu.wiley.com/WileyCDA/WileyTitle/productCd-0470873663.html.
 
+    Returns
+    -------
+    float or numpy.ndarray
+        float for a single date, array for an array of dates.
+    """
+
+    # single dates are cached, as every band of a scene shares one.
+    # The key is the wall clock time, which the formulas use. Custom
+    # formulas may not be hashable, so only named ones are cached
+    if isinstance(date, datetime.datetime):
+        date = date.replace(tzinfo=None)
+
+        if isinstance(formula, str):
+            return _earth_sun_dist_cached(date, formula)
+
+        return _earth_sun_dist(np.datetime64(date, "s"), formula)
+
+    if not np.issubdtype(np.asarray(date).dtype, np.datetime64):
+        raise TypeError(
+            f"Date must be of type {datetime.datetime} or {np.datetime64}!"
+        )
+
+    return _earth_sun_dist(np.asarray(date, dtype="datetime64[s]"), formula)
+
+
+@functools.lru_cache(maxsize=4096)
+def _earth_sun_dist_cached(date, formula):
+
+    """
+    Function to calculate Earth-Sun distance for a single date,
+    cached by date and formula name.
+
+    Params
+    ------
+    date : datetime.datetime
+        Naive datetime object.
+
+    formula : str
+        Formula name, see earth_sun_dist.
+
     Returns
     -------
     float
     """
 
-    if not isinstance(date, datetime.datetime):
-        raise TypeError(f"Date must be of type {datetime.datetime}!")
-    
-    doy = date.timetuple().tm_yday
+    return _earth_sun_dist(np.datetime64(date, "s"), formula)
 
-    if formula == "Meeus":
-        if date.month <= 2:
-            year = date.year - 1
-            month = date.month + 12
-        else:
-            year = date.year
-            month = date.month
-        
-        day = date.day
-        ut = date.hour + (date.minute/60) + (date.second/3600)
 
-        a = int(year/100)
-        b = 2 - a + int(a/4)
+def _earth_sun_dist(dates, formula):
 
-        jd = int(365.25 * (year + 4716)) + int(30.6001 * (month + 1)) \
-            + day + (ut/24.0) + b - 1524.5
-        d = jd - 2451545.0
-        g = np.radians(357.529 + 0.98560028 * d)
+    """
+    Function to calculate Earth-Sun distance for a date scalar or
+    array. NaT dates give NaN.
 
-        return 1.00014 - 0.01671 * np.cos(g) - 0.00014 * np.cos(2*g)
+    Params
+    ------
+    dates : numpy.datetime64 or numpy.ndarray
+        Date scalar or array (numpy.datetime64[s]).
 
-    elif formula == "Spencer":
-        p = 2 * np.pi * (doy - 1) / 365
-        return (1/(1.000110 + 0.034221 * np.cos(p) + 0.001280 * np.sin(p) \
-            + 0.000719 * np.cos(2 * p) + 0.000077 * np.sin(2 * p)))**0.5
+    formula : str or callable
+        Formula name or custom formula, see earth_sun_dist.
 
-    elif formula == "Mather":
-        return 1/(1 - 0.016729 * np.cos(0.9856 * (doy - 4)))
+    Returns
+    -------
+    float or numpy.ndarray
+    """
 
-    elif formula == "ESA":
-        return 1 - 0.016729 * np.cos((2 * np.pi) * (0.9856 * (doy - 4) / 360))
+    scalar = np.ndim(dates) == 0
+    dates = np.atleast_1d(dates)
 
-    elif formula == "Duffie":
-        return 1 + 0.033 * np.cos(doy * 2 * np.pi / 365)
+    # day of year
+    doy = (dates.astype("datetime64[D]") - dates.astype("datetime64[Y]")).astype(int) + 1
 
+    if callable(formula):
+        dist = formula(dates, doy)
+    elif formula in _FORMULAS:
+        dist = _FORMULAS[formula](dates, doy)
     else:
-        formulas = ["Meeus", "Spencer", "Mather", "ESA", "Duffie"]
-        raise ValueError(f"Formula must be one of {formulas}!")
+        raise ValueError(f"Formula must be one of {list(_FORMULAS)}!")
+
+    # the integer casts turn NaT into a valid looking date
+    dist = np.where(np.isnat(dates), np.nan, dist)
+
+    return dist[0] if scalar else dist
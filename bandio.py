@@ -0,0 +1,489 @@
+from osgeo import gdal
+from xml.sax.saxutils import escape
+import numpy as np
+import os
+
+
+# GeoTIFF creation options for all output scenes: 256x256 tiles so
+# block writes are tile aligned, ZSTD compression and BigTIFF when
+# the output could exceed 4GB
+CREATION_OPTIONS = [
+    "TILED=YES",
+    "BLOCKXSIZE=256",
+    "BLOCKYSIZE=256",
+    "COMPRESS=ZSTD",
+    "BIGTIFF=IF_SAFER",
+]
+
+# GDAL configuration for bulk I/O on large scenes: a 1GB block cache,
+# no directory listing on open (slow on S3 and NFS), multi-threaded
+# decoding and cached reads of remote files
+GDAL_CONFIG = {
+    "GDAL_CACHEMAX": "1024",
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "GDAL_NUM_THREADS": "ALL_CPUS",
+    "VSI_CACHE": "TRUE",
+}
+
+
+def configure_gdal(**options):
+
+    """
+    Function to set GDAL configuration options. Called on import
+    with the GDAL_CONFIG defaults, which do not override options
+    already set, e.g. through environment variables, nor a cache
+    size already set with gdal.SetCacheMax. Options passed 
+    explicitly are always set. GDAL reads GDAL_CACHEMAX only once,
+    when the block cache is first used, so it is applied directly
+    with gdal.SetCacheMax and takes effect even after datasets 
+    have been read.
+
+    Params
+    ------
+    **options : str
+        GDAL configuration options, e.g. GDAL_CACHEMAX="2048".
+        GDAL_CACHEMAX is parsed like GDAL does: megabytes below
+        100000, bytes from 100000, a unit such as "1GB", or a
+        percentage of physical memory such as "25%".
+
+    Returns
+    -------
+    None
+    """
+
+    for key, value in GDAL_CONFIG.items():
+        if key in options or gdal.GetConfigOption(key) is not None:
+            continue
+
+        # keep a cache size the caller already set
+        if key == "GDAL_CACHEMAX" and gdal.GetCacheMax() != _cache_max("5%"):
+            continue
+
+        _set_config(key, value)
+
+    for key, value in options.items():
+        _set_config(key, str(value))
+
+
+def _set_config(key, value):
+
+    """
+    Function to set a single GDAL configuration option.
+
+    Params
+    ------
+    key : str
+        GDAL configuration option name.
+
+    value : str
+        GDAL configuration option value.
+
+    Returns
+    -------
+    None
+    """
+
+    if key == "GDAL_CACHEMAX":
+        # the config option is ignored once the cache is in use
+        gdal.SetCacheMax(_cache_max(value))
+    else:
+        gdal.SetConfigOption(key, value)
+
+
+# GDAL_CACHEMAX units, in bytes
+_CACHE_UNITS = {
+    "KB": 1024,
+    "MB": 1024**2,
+    "GB": 1024**3,
+    "TB": 1024**4,
+}
+
+
+def _cache_max(value):
+
+    """
+    Function to convert a GDAL_CACHEMAX value to bytes, following 
+    GDAL. Plain numbers below 100000 are megabytes, larger ones
+    bytes. GDAL's default is 5% of physical memory.
+
+    Params
+    ------
+    value : str
+        GDAL_CACHEMAX value, e.g. "1024", "1GB" or "25%".
+
+    Returns
+    -------
+    int
+    """
+
+    text = value.strip().upper()
+
+    try:
+        if text.endswith("%"):
+            size = int(gdal.GetUsablePhysicalRAM() * float(text[:-1]) / 100)
+        elif text[-2:] in _CACHE_UNITS:
+            size = int(float(text[:-2]) * _CACHE_UNITS[text[-2:]])
+        else:
+            size = int(text)
+            size = size * 1024**2 if size < 100000 else size
+
+    except ValueError:
+        raise ValueError(
+            f"GDAL_CACHEMAX must be megabytes, bytes, a size with a "
+            f"unit or a percentage, not {value!r}!"
+        ) from None
+
+    if size < 0:
+        raise ValueError(f"GDAL_CACHEMAX must not be negative, not {value!r}!")
+
+    return size
+
+
+configure_gdal()
+
+
+def _creation_options(dtype):
+
+    """
+    Function to get the GeoTIFF creation options for a target
+    data type. The floating point predictor only applies to 
+    floating point output.
+
+    Params
+    ------
+    dtype : int
+        GDAL data type of the target scene.
+
+    Returns
+    -------
+    list of str
+    """
+
+    if dtype in (gdal.GDT_Float32, gdal.GDT_Float64):
+        return CREATION_OPTIONS + ["PREDICTOR=3"]
+
+    return CREATION_OPTIONS + ["PREDICTOR=2"]
+
+
+def _open(input_scene):
+
+    """
+    Function to open a Landsat scene, passing through datasets
+    that are already open.
+
+    Params
+    ------
+    input_scene : str or osgeo.gdal.Dataset
+        File path to Landsat scene (.TIF), or an open dataset.
+
+    Returns
+    -------
+    osgeo.gdal.Dataset
+    """
+
+    if isinstance(input_scene, gdal.Dataset):
+        return input_scene
+
+    src_ds = gdal.Open(input_scene)
+
+    # GDAL only logs failed opens
+    if src_ds is None:
+        raise RuntimeError(gdal.GetLastErrorMsg())
+
+    return src_ds
+
+
+def _blocks(xsize, ysize, bx, by):
+
+    """
+    Function to iterate over the blocks of a raster, row by row.
+    Edge blocks are clipped to the raster extent.
+
+    Params
+    ------
+    xsize : int
+        Raster width in pixels.
+
+    ysize : int
+        Raster height in pixels.
+
+    bx : int
+        Block width in pixels.
+
+    by : int
+        Block height in pixels.
+
+    Returns
+    -------
+    generator of tuple
+        (x offset, y offset, width, height) of each block.
+    """
+
+    for y in range(0, ysize, by):
+        for x in range(0, xsize, bx):
+            yield x, y, min(bx, xsize - x), min(by, ysize - y)
+
+
+def _apply_block(src_band, trg_band, fn):
+
+    """
+    Function to apply a NumPy kernel to a source band block by
+    block and write the result to a target band. Blocks follow
+    the block size of the target band, so writes are tile aligned
+    and only one block is held in memory at a time. Blocks are
+    read as float32 into buffers allocated once and reused.
+
+    Params
+    ------
+    src_band : osgeo.gdal.Band
+        Source raster band.
+
+    trg_band : osgeo.gdal.Band
+        Target raster band. Must have the same dimensions as
+        the source band.
+
+    fn : callable
+        Kernel taking a float32 source block (numpy.ndarray) and
+        a float32 target block of the same shape to fill in place.
+
+    Returns
+    -------
+    None
+    """
+
+    xsize = src_band.XSize
+    ysize = src_band.YSize
+    bx, by = trg_band.GetBlockSize()
+
+    # preallocate block buffers
+    src_buf = np.empty((by, bx), dtype=np.float32)
+    trg_buf = np.empty((by, bx), dtype=np.float32)
+
+    for x, y, win_xsize, win_ysize in _blocks(xsize, ysize, bx, by):
+
+        # views on the buffers for edge blocks
+        src_ar = src_buf[:win_ysize, :win_xsize]
+        trg_ar = trg_buf[:win_ysize, :win_xsize]
+
+        # read, convert and write block
+        src_band.ReadAsArray(x, y, win_xsize, win_ysize, buf_obj=src_ar)
+        fn(src_ar, trg_ar)
+        trg_band.WriteArray(trg_ar, x, y)
+
+
+def _map_band(input_scene, output_scene, kernel_fn, dtype=gdal.GDT_Float32):
+
+    """
+    Function to map a single band Landsat scene to a new scene
+    with a per-pixel NumPy kernel. The target scene inherits the
+    geotransform, projection and nodata value of the source scene.
+
+    Params
+    ------
+    input_scene : str or osgeo.gdal.Dataset
+        File path to Landsat scene (.TIF), or an open dataset.
+
+    output_scene : str
+        File path to output scene (.TIF). File must not already 
+        exist.
+
+    kernel_fn : callable
+        Kernel taking a float32 source block (numpy.ndarray), the
+        source nodata value (None if unset) and a float32 target 
+        block to fill in place, with nodata already substituted.
+
+    dtype : int
+        GDAL data type of the target scene. Default is Float32.
+
+    Returns
+    -------
+    None
+    """
+
+    # ensure output does not already exist
+    if os.path.exists(output_scene):
+        raise ValueError(f"{output_scene} already exists!")
+    
+    # open source dataset
+    src_ds = _open(input_scene)
+    src_band = src_ds.GetRasterBand(1)
+
+    # get source nodata value
+    no_data = src_band.GetNoDataValue()
+
+    # create tiled and compressed target dataset
+    drv = gdal.GetDriverByName("GTiff")
+    trg_ds = drv.Create(
+        output_scene, 
+        src_ds.RasterXSize, 
+        src_ds.RasterYSize, 
+        1, 
+        dtype,
+        options=_creation_options(dtype)
+    )
+
+    # set target metadata
+    trg_ds.SetGeoTransform(src_ds.GetGeoTransform())
+    trg_ds.SetProjection(src_ds.GetProjection())
+
+    # get target band
+    trg_band = trg_ds.GetRasterBand(1)
+
+    # set target nodata value. Without one, kernels get None and
+    # skip the nodata comparison entirely
+    if no_data is None:
+        kernel_no_data = None
+    else:
+        trg_band.SetNoDataValue(no_data)
+
+        # match the float32 blocks so kernels never promote to float64
+        kernel_no_data = np.float32(no_data)
+
+    # convert and write band block by block
+    _apply_block(
+        src_band, 
+        trg_band, 
+        lambda src_ar, trg_ar: kernel_fn(src_ar, kernel_no_data, trg_ar)
+    )
+
+    # close handles
+    trg_ds.FlushCache()
+    trg_ds = None
+    trg_band = None
+    src_ds = None
+    src_band = None
+
+
+def _scale_band(input_scene, output_scene, gain, bias):
+
+    """
+    Function to apply a gain and bias to a single band Landsat
+    scene entirely within GDAL. See _scale_bands.
+
+    Params
+    ------
+    input_scene : str or osgeo.gdal.Dataset
+        File path to Landsat scene (.TIF), or an open dataset 
+        backed by a file, which is reopened by name.
+
+    output_scene : str
+        File path to output scene (.TIF). File must not already 
+        exist.
+
+    gain : float
+        Multiplicative factor.
+
+    bias : float
+        Additive factor.
+
+    Returns
+    -------
+    None
+    """
+
+    _scale_bands(input_scene, output_scene, {1: (gain, bias)})
+
+
+def _scale_bands(input_scene, output_scene, band_params):
+
+    """
+    Function to apply a gain and bias to bands of a Landsat scene 
+    entirely within GDAL. The scene is wrapped in an in-memory VRT
+    with one band per source band, each scaled on read, then 
+    translated to a float32 GeoTIFF, so no pixels pass through
+    Python. The VRT opens the source again by name, separately from
+    the handle used here for its metadata, and its bands share that
+    one handle. Source nodata pixels keep the nodata value. An open
+    dataset is flushed first; datasets GDAL cannot reopen by name,
+    e.g. MEM datasets, raise ValueError. Local files and /vsi paths
+    such as /vsis3/ are both supported.
+
+    Params
+    ------
+    input_scene : str or osgeo.gdal.Dataset
+        File path to Landsat scene (.TIF), or an open dataset 
+        backed by a file, which is reopened by name.
+
+    output_scene : str
+        File path to output scene (.TIF). File must not already 
+        exist.
+
+    band_params : dict
+        Maps source band number to a (gain, bias) tuple. Output
+        bands follow the order of the dict.
+
+    Returns
+    -------
+    None
+    """
+
+    # ensure output does not already exist
+    if os.path.exists(output_scene):
+        raise ValueError(f"{output_scene} already exists!")
+
+    # open source dataset
+    src_ds = _open(input_scene)
+
+    # the VRT reopens the source by name, so pending writes must
+    # reach the file and the file must exist, locally or on a /vsi
+    # file system
+    if isinstance(input_scene, gdal.Dataset):
+        src_ds.FlushCache()
+
+        if gdal.VSIStatL(src_ds.GetDescription()) is None:
+            raise ValueError("Input dataset must be backed by a file!")
+
+    src_path = escape(src_ds.GetDescription())
+
+    # create in-memory VRT with the source metadata
+    vrt_ds = gdal.GetDriverByName("VRT").Create(
+        "", 
+        src_ds.RasterXSize, 
+        src_ds.RasterYSize, 
+        0
+    )
+    vrt_ds.SetGeoTransform(src_ds.GetGeoTransform())
+    vrt_ds.SetProjection(src_ds.GetProjection())
+
+    for n, (src_n, (gain, bias)) in enumerate(band_params.items(), start=1):
+
+        # get source nodata value
+        no_data = src_ds.GetRasterBand(src_n).GetNoDataValue()
+
+        vrt_ds.AddBand(gdal.GDT_Float32)
+        vrt_band = vrt_ds.GetRasterBand(n)
+
+        # scale the source on read, skipping nodata pixels so they
+        # keep the band nodata value
+        source = (
+            "<ComplexSource>"
+            f"<SourceFilename relativeToVRT=\"0\">{src_path}</SourceFilename>"
+            f"<SourceBand>{src_n}</SourceBand>"
+            f"<ScaleOffset>{float(bias)!r}</ScaleOffset>"
+            f"<ScaleRatio>{float(gain)!r}</ScaleRatio>"
+        )
+
+        if no_data is not None:
+            vrt_band.SetNoDataValue(no_data)
+            source += f"<NODATA>{no_data!r}</NODATA>"
+
+        source += "</ComplexSource>"
+        vrt_band.SetMetadataItem("source_0", source, "new_vrt_sources")
+
+    # write tiled and compressed target dataset
+    trg_ds = gdal.Translate(
+        output_scene, 
+        vrt_ds, 
+        format="GTiff", 
+        creationOptions=_creation_options(gdal.GDT_Float32)
+    )
+
+    # GDAL only logs failed reads and writes
+    if trg_ds is None:
+        raise RuntimeError(gdal.GetLastErrorMsg())
+
+    # close handles
+    trg_ds = None
+    vrt_band = None
+    vrt_ds = None
+    src_ds = None
@@ -0,0 +1,160 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import os
+
+from bandio import configure_gdal
+from kernels import require_threadsafe, set_num_threads
+import toar
+
+
+# conversions available to calibrate_scene, keyed by name
+METHODS = {
+    "toa_radiance": toar.toa_radiance,
+    "toa_reflectance": toar.toa_reflectance,
+    "toa_brightness": toar.toa_brightness,
+}
+
+
+def _init_worker(threads):
+
+    """
+    Function to configure GDAL and the kernels in each worker 
+    process. Workers share the machine, so each gets a modest 
+    cache and an even share of the cores.
+
+    Params
+    ------
+    threads : int
+        Number of threads for GDAL and the kernels.
+
+    Returns
+    -------
+    None
+    """
+
+    configure_gdal(
+        GDAL_NUM_THREADS=str(threads), 
+        GDAL_CACHEMAX="512", 
+        GDAL_DISABLE_READDIR_ON_OPEN="TRUE"
+    )
+    set_num_threads(threads)
+
+
+def _run_task(fn, args, threads):
+
+    """
+    Function to run a conversion in a worker thread with a capped
+    number of kernel threads. The Numba limit is thread local, so
+    it is set in the thread that runs the conversion.
+
+    Params
+    ------
+    fn : callable
+        Conversion, e.g. toar.toa_radiance.
+
+    args : tuple
+        Positional arguments of the conversion.
+
+    threads : int
+        Number of kernel threads.
+
+    Returns
+    -------
+    None
+    """
+
+    set_num_threads(threads)
+    fn(*args)
+
+
+def calibrate_scene(inputs, workers=None):
+
+    """
+    Function to calibrate many bands or scenes in parallel. Each
+    band is converted in its own process, which opens its own
+    GDAL datasets.
+
+    Params
+    ------
+    inputs : list of dict
+        One dict per band. The "method" key names the conversion,
+        one of toa_radiance, toa_reflectance or toa_brightness.
+        The remaining keys are passed to it as keyword arguments,
+        e.g. {"method": "toa_radiance", "input_scene": "B4.TIF",
+        "gain": 0.01, "bias": -60.0, "output_scene": "B4_rad.TIF"}.
+
+    workers : int
+        Number of worker processes. Default is the number of CPUs.
+
+    Returns
+    -------
+    None
+    """
+
+    # validate all methods before starting any work
+    for params in inputs:
+        if params.get("method") not in METHODS:
+            raise ValueError(f"Method must be one of {list(METHODS)}!")
+
+    # split the cores between the workers
+    workers = workers or os.cpu_count()
+    threads = max(1, os.cpu_count() // workers)
+
+    with ProcessPoolExecutor(
+        max_workers=workers, 
+        initializer=_init_worker, 
+        initargs=(threads,)
+    ) as ex:
+        futures = [
+            ex.submit(
+                METHODS[params["method"]], 
+                **{k: v for k, v in params.items() if k != "method"}
+            )
+            for params in inputs
+        ]
+
+        # raise the first error, if any
+        for future in futures:
+            future.result()
+
+
+def calibrate_bands(specs, workers=8):
+
+    """
+    Function to calibrate the bands of a scene in parallel threads.
+    GDAL, Numba and numexpr release the GIL while reading, 
+    converting and writing, and each conversion opens its own 
+    datasets, so bands run concurrently within one process. 
+    Each thread gets an even share of the cores for its kernels.
+    Raises RuntimeError if Numba cannot use a threadsafe 
+    threading layer.
+
+    Params
+    ------
+    specs : list of tuple
+        One (fn, args) tuple per band, where fn is a conversion
+        such as toar.toa_radiance and args is a tuple of its 
+        positional arguments.
+
+    workers : int
+        Number of worker threads. Default is 8.
+
+    Returns
+    -------
+    None
+    """
+
+    # concurrent parallel kernels need a threadsafe layer
+    require_threadsafe()
+
+    # split the cores between the threads
+    threads = max(1, os.cpu_count() // workers)
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = [
+            ex.submit(_run_task, fn, args, threads) 
+            for fn, args in specs
+        ]
+
+        # raise the first error, if any
+        for future in futures:
+            future.result()
@@ -1,6 +1,7 @@
-from osgeo import gdal
 import numpy as np
-import os
+
+from bandio import _map_band
+from kernels import _bright_kernel
 
 
 def toa_rad_to_toa_bright(input_scene, k1, k2, output_scene):
@@ -11,8 +12,8 @@ def toa_rad_to_toa_bright(input_scene, k1, k2, output_scene):
 
     Params
     ------
-    input_scene : str
-        File path to Landsat scene (.TIF)
+    input_scene : str or osgeo.gdal.Dataset
+        File path to Landsat scene (.TIF), or an open dataset.
     
     k1 : float
         Band specific calibration constant 1 (Kelvin).
@@ -29,53 +30,13 @@ def toa_rad_to_toa_bright(input_scene, k1, k2, output_scene):
     None
     """
 
-    # ensure output does not already exist
-    if os.path.exists(output_scene):
-        raise ValueError(f"{output_scene} already exists!")
-    
-    # open source dataset
-    src_ds = gdal.Open(input_scene)
-    src_band = src_ds.GetRasterBand(1)
-
-    # get source nodata value
-    no_data = src_band.GetNoDataValue()
-
-    # read in source array
-    src_ar = src_band.ReadAsArray()
-
-    # create target dataset
-    drv = gdal.GetDriverByName("GTiff")
-    trg_ds = drv.Create(
-        output_scene, 
-        src_ds.RasterXSize, 
-        src_ds.RasterYSize, 
-        1, 
-        gdal.GDT_Float32
-    )
-
-    # set target metadata
-    trg_ds.SetGeoTransform(src_ds.GetGeoTransform())
-    trg_ds.SetProjection(src_ds.GetProjection())
-
-    # get target band
-    trg_band = trg_ds.GetRasterBand(1)
-
-    # set target nodata value
-    trg_band.SetNoDataValue(no_data)
-
     # convert to brightness
-    trg_ar = k2 / np.log((k1 / src_ar) + 1)
-    trg_ar[src_ar == no_data] = no_data
+    k1, k2 = np.float32(k1), np.float32(k2)
 
-    # write radiance to band
-    trg_band.WriteArray(trg_ar)
+    def kernel(src_ar, no_data, trg_ar):
+        _bright_kernel(src_ar, np.float32(1), np.float32(0), k1, k2, no_data, trg_ar)
 
-    # close handles
-    trg_ds.FlushCache()
-    trg_ds = None
-    trg_band = None
-    src_ds = None
-    src_band = None
+    _map_band(input_scene, output_scene, kernel)
 
 
 def dn_to_toa_bright(input_scene, gain, bias, k1, k2, output_scene):
@@ -86,8 +47,8 @@ def dn_to_toa_bright(input_scene, gain, bias, k1, k2, output_scene):
 
     Params
     ------
-    input_scene : str
-        File path to Landsat scene (.TIF)
+    input_scene : str or osgeo.gdal.Dataset
+        File path to Landsat scene (.TIF), or an open dataset.
     
     k1 : float
         Band specific calibration constant 1 (Kelvin).
@@ -104,53 +65,11 @@ def dn_to_toa_bright(input_scene, gain, bias, k1, k2, output_scene):
     None
     """
 
-    # ensure output does not already exist
-    if os.path.exists(output_scene):
-        raise ValueError(f"{output_scene} already exists!")
-    
-    # open source dataset
-    src_ds = gdal.Open(input_scene)
-    src_band = src_ds.GetRasterBand(1)
-
-    # get source nodata value
-    no_data = src_band.GetNoDataValue()
-
-    # read in source array
-    src_ar = src_band.ReadAsArray()
-
-    # create target dataset
-    drv = gdal.GetDriverByName("GTiff")
-    trg_ds = drv.Create(
-        output_scene, 
-        src_ds.RasterXSize, 
-        src_ds.RasterYSize, 
-        1, 
-        gdal.GDT_Float32
-    )
+    # convert to brightness via radiance
+    gain, bias = np.float32(gain), np.float32(bias)
+    k1, k2 = np.float32(k1), np.float32(k2)
 
-    # set target metadata
-    trg_ds.SetGeoTransform(src_ds.GetGeoTransform())
-    trg_ds.SetProjection(src_ds.GetProjection())
+    def kernel(src_ar, no_data, trg_ar):
+        _bright_kernel(src_ar, gain, bias, k1, k2, no_data, trg_ar)
 
-    # get target band
-    trg_band = trg_ds.GetRasterBand(1)
-
-    # set target nodata value
-    trg_band.SetNoDataValue(no_data)
-
-    # convert to radiance
-    rad_ar = (gain * src_ar) + bias
-
-    # convert to brightness
-    bri_ar = k2 / np.log((k1 / rad_ar) + 1)
-    bri_ar[src_ar == no_data] = no_data
-
-    # write radiance to band
-    trg_band.WriteArray(bri_ar)
-
-    # close handles
-    trg_ds.FlushCache()
-    trg_ds = None
-    trg_band = None
-    src_ds = None
-    src_band = None
+    _map_band(input_scene, output_scene, kernel)
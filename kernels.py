@@ -0,0 +1,102 @@
+import os
+
+
+# ahead-of-time compiled kernels, built by running kernels_aot.py,
+# skip the JIT compile but run serially, so they are opt-in
+if os.environ.get("LANDSAT_UTILS_AOT") == "1":
+    from kernels_aot import _bright_kernel, _brovey_kernel
+    BACKEND = "aot"
+else:
+    try:
+        from kernels_numba import _bright_kernel, _brovey_kernel
+        BACKEND = "numba"
+    except ImportError:
+        # numba is not installed, fall back to numexpr
+        from kernels_numexpr import _bright_kernel, _brovey_kernel
+        BACKEND = "numexpr"
+
+
+def set_num_threads(n):
+
+    """
+    Function to cap the number of threads the kernels use. The
+    Numba limit applies to the calling thread only, the numexpr
+    limit to the whole process.
+
+    Params
+    ------
+    n : int
+        Maximum number of threads.
+
+    Returns
+    -------
+    None
+    """
+
+    try:
+        import numba
+    except ImportError:
+        pass
+    else:
+        numba.set_num_threads(min(n, numba.config.NUMBA_NUM_THREADS))
+
+    try:
+        import numexpr as ne
+    except ImportError:
+        pass
+    else:
+        ne.set_num_threads(n)
+
+
+def require_threadsafe():
+
+    """
+    Function to ensure the kernels can be called from several
+    threads at once. Numba's default workqueue threading layer
+    aborts the process when parallel kernels run concurrently,
+    so a threadsafe layer (tbb or omp) is requested before the
+    first parallel kernel launches the threads. Raises 
+    RuntimeError if no threadsafe layer is available, leaving the
+    threading layer setting unchanged.
+
+    Params
+    ------
+    None
+
+    Returns
+    -------
+    None
+    """
+
+    # only the parallel Numba kernels have a threading layer
+    if BACKEND != "numba":
+        return
+
+    import numba
+
+    try:
+        layer = numba.threading_layer()
+    except ValueError:
+        # threads not launched yet, keep any layer set explicitly
+        previous = numba.config.THREADING_LAYER
+        if previous == "default":
+            numba.config.THREADING_LAYER = "threadsafe"
+
+        # launch the threads, raises if no threadsafe layer loads
+        try:
+            numba.get_num_threads()
+        except ValueError as e:
+            # restore the layer so serial use of the kernels still works
+            numba.config.THREADING_LAYER = previous
+            raise RuntimeError(
+                "No threadsafe Numba threading layer could be loaded, "
+                "install tbb or an OpenMP runtime!"
+            ) from e
+
+        layer = numba.threading_layer()
+
+    if layer == "workqueue":
+        raise RuntimeError(
+            "Numba workqueue threading layer is not threadsafe, "
+            "install tbb or set NUMBA_THREADING_LAYER=threadsafe!"
+        )
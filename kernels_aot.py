@@ -0,0 +1,117 @@
+import math
+import os
+
+
+def _bright(src, gain, bias, k1, k2, has_nodata, nodata, out):
+
+    """
+    Serial brightness temperature kernel, see 
+    kernels_numba._bright_kernel.
+    """
+
+    for i in range(src.shape[0]):
+        for j in range(src.shape[1]):
+            v = src[i, j]
+            if has_nodata and v == nodata:
+                out[i, j] = nodata
+            else:
+                # pycc uses the Python error model, so guard the 
+                # division the JIT kernel lets overflow to 0
+                rad = gain * v + bias
+                out[i, j] = 0 if rad == 0 else k2 / math.log1p(k1 / rad)
+
+
+def _brovey(r, g, b, i, p, rw, gw, bw, iw, has_nodata, nodata, 
+            ro, go, bo, io):
+
+    """
+    Serial adjusted Brovey kernel, see kernels_numba._brovey_kernel.
+    """
+
+    # value for invalid pixels
+    fill = nodata if has_nodata else 0
+
+    for y in range(p.shape[0]):
+        for x in range(p.shape[1]):
+            rv = r[y, x]
+            gv = g[y, x]
+            bv = b[y, x]
+            iv = i[y, x]
+            pv = p[y, x]
+            den = rw * rv + gw * gv + bw * bv
+
+            invalid = den == 0
+            if has_nodata:
+                invalid = invalid or (pv == nodata or rv == nodata 
+                    or gv == nodata or bv == nodata or iv == nodata)
+
+            if invalid:
+                ro[y, x] = fill
+                go[y, x] = fill
+                bo[y, x] = fill
+                io[y, x] = fill
+            else:
+                dnf = (pv - iw * iv) / den
+                ro[y, x] = rv * dnf
+                go[y, x] = gv * dnf
+                bo[y, x] = bv * dnf
+                io[y, x] = iv * dnf
+
+
+def _bright_kernel(src, gain, bias, k1, k2, nodata, out):
+
+    """
+    Function to convert a block to brightness temperature with the
+    ahead-of-time compiled kernel. Same interface as 
+    kernels_numba._bright_kernel.
+    """
+
+    landsat_kernels.bright(
+        src, gain, bias, k1, k2, 
+        nodata is not None, 0 if nodata is None else nodata, 
+        out
+    )
+
+
+def _brovey_kernel(r, g, b, i, p, rw, gw, bw, iw, nodata, ro, go, bo, io):
+
+    """
+    Function to pansharpen a block with the ahead-of-time compiled
+    adjusted Brovey kernel. Same interface as 
+    kernels_numba._brovey_kernel.
+    """
+
+    landsat_kernels.brovey(
+        r, g, b, i, p, rw, gw, bw, iw, 
+        nodata is not None, 0 if nodata is None else nodata, 
+        ro, go, bo, io
+    )
+
+
+if __name__ == "__main__":
+
+    # build the landsat_kernels extension next to this file, which
+    # removes the JIT compile on first call at the cost of the
+    # parallel loops (pycc compiles serial code only). Enable the
+    # built kernels with LANDSAT_UTILS_AOT=1
+    from numba.pycc import CC
+
+    cc = CC("landsat_kernels")
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+    block = "f4[:,:]"
+    cc.export(
+        "bright", 
+        f"void({block}, f4, f4, f4, f4, b1, f4, {block})"
+    )(_bright)
+    cc.export(
+        "brovey", 
+        f"void({', '.join([block] * 5)}, f4, f4, f4, f4, b1, f4, "
+        f"{', '.join([block] * 4)})"
+    )(_brovey)
+
+    cc.compile()
+
+else:
+    # raises ImportError until the extension is built
+    import landsat_kernels
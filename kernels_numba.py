@@ -0,0 +1,117 @@
+from numba import njit, prange
+import math
+
+
+@njit(parallel=True, fastmath=True, cache=True, nogil=True)
+def _bright_kernel(src, gain, bias, k1, k2, nodata, out):
+
+    """
+    Function to convert a block to brightness temperature in a
+    single pass, carrying nodata pixels through unchanged. The
+    block is first rescaled to radiance with a gain and bias;
+    pass a gain of 1 and bias of 0 for blocks already in radiance.
+
+    Params
+    ------
+    src : numpy.ndarray
+        2D source block.
+
+    gain : float
+        Multiplicative radiance factor.
+
+    bias : float
+        Additive radiance factor.
+
+    k1 : float
+        Calibration constant 1 (Kelvin).
+
+    k2 : float
+        Calibration constant 2 (W/(m2 sr um).
+
+    nodata : float or None
+        Source nodata value. None skips the nodata comparison,
+        which Numba compiles out of the loop.
+
+    out : numpy.ndarray
+        2D target block, same shape as src. Filled in place.
+
+    Returns
+    -------
+    None
+    """
+
+    for i in prange(src.shape[0]):
+        for j in range(src.shape[1]):
+            v = src[i, j]
+            if nodata is not None and v == nodata:
+                out[i, j] = nodata
+            else:
+                out[i, j] = k2 / math.log1p(k1 / (gain * v + bias))
+
+
+@njit(parallel=True, fastmath=True, cache=True, nogil=True)
+def _brovey_kernel(r, g, b, i, p, rw, gw, bw, iw, nodata, ro, go, bo, io):
+
+    """
+    Function to pansharpen a block with the adjusted Brovey
+    transform in a single pass. The detail factor
+
+        DNF = (P - IW * I) / (RW * R + GW * G + BW * B)
+
+    is computed once per pixel and applied to every band. Pixels
+    that are nodata in any input, or whose weighted sum is zero,
+    are set to nodata (0 when there is no nodata value).
+
+    Params
+    ------
+    r, g, b, i : numpy.ndarray
+        2D red, green, blue and near infrared blocks, resampled
+        to the panchromatic grid.
+
+    p : numpy.ndarray
+        2D panchromatic block.
+
+    rw, gw, bw, iw : float
+        Red, green, blue and near infrared weights.
+
+    nodata : float or None
+        Nodata value. None skips the nodata comparisons, which
+        Numba compiles out of the loop.
+
+    ro, go, bo, io : numpy.ndarray
+        2D red, green, blue and near infrared target blocks, same
+        shape as p. Filled in place.
+
+    Returns
+    -------
+    None
+    """
+
+    # value for invalid pixels
+    fill = 0 if nodata is None else nodata
+
+    for y in prange(p.shape[0]):
+        for x in range(p.shape[1]):
+            rv = r[y, x]
+            gv = g[y, x]
+            bv = b[y, x]
+            iv = i[y, x]
+            pv = p[y, x]
+            den = rw * rv + gw * gv + bw * bv
+
+            invalid = den == 0
+            if nodata is not None:
+                invalid = invalid or (pv == nodata or rv == nodata 
+                    or gv == nodata or bv == nodata or iv == nodata)
+
+            if invalid:
+                ro[y, x] = fill
+                go[y, x] = fill
+                bo[y, x] = fill
+                io[y, x] = fill
+            else:
+                dnf = (pv - iw * iv) / den
+                ro[y, x] = rv * dnf
+                go[y, x] = gv * dnf
+                bo[y, x] = bv * dnf
+                io[y, x] = iv * dnf
@@ -0,0 +1,110 @@
+import numexpr as ne
+import os
+
+
+# use every core, as the numba kernels do
+ne.set_num_threads(os.cpu_count())
+
+
+def _bright_kernel(src, gain, bias, k1, k2, nodata, out):
+
+    """
+    Function to convert a block to brightness temperature in a
+    single blocked, multi-threaded numexpr pass, carrying nodata 
+    pixels through unchanged. The block is first rescaled to 
+    radiance with a gain and bias; pass a gain of 1 and bias of 0 
+    for blocks already in radiance.
+
+    Params
+    ------
+    src : numpy.ndarray
+        2D source block.
+
+    gain : float
+        Multiplicative radiance factor.
+
+    bias : float
+        Additive radiance factor.
+
+    k1 : float
+        Calibration constant 1 (Kelvin).
+
+    k2 : float
+        Calibration constant 2 (W/(m2 sr um).
+
+    nodata : float or None
+        Source nodata value. None skips the nodata comparison.
+
+    out : numpy.ndarray
+        2D target block, same shape as src. Filled in place.
+
+    Returns
+    -------
+    None
+    """
+
+    expr = "k2 / log1p(k1 / (gain * src + bias))"
+
+    if nodata is not None:
+        expr = f"where(src == nodata, nodata, {expr})"
+
+    ne.evaluate(expr, out=out, casting="same_kind")
+
+
+def _brovey_kernel(r, g, b, i, p, rw, gw, bw, iw, nodata, ro, go, bo, io):
+
+    """
+    Function to pansharpen a block with the adjusted Brovey
+    transform using numexpr. The detail factor
+
+        DNF = (P - IW * I) / (RW * R + GW * G + BW * B)
+
+    is computed once and applied to every band. Pixels that are 
+    nodata in any input, or whose weighted sum is zero, are set 
+    to nodata (0 when there is no nodata value).
+
+    Params
+    ------
+    r, g, b, i : numpy.ndarray
+        2D red, green, blue and near infrared blocks, resampled
+        to the panchromatic grid.
+
+    p : numpy.ndarray
+        2D panchromatic block.
+
+    rw, gw, bw, iw : float
+        Red, green, blue and near infrared weights.
+
+    nodata : float or None
+        Nodata value. None skips the nodata comparisons.
+
+    ro, go, bo, io : numpy.ndarray
+        2D red, green, blue and near infrared target blocks, same
+        shape as p. Filled in place.
+
+    Returns
+    -------
+    None
+    """
+
+    # value for invalid pixels
+    fill = 0 if nodata is None else nodata
+
+    den = ne.evaluate("rw * r + gw * g + bw * b")
+
+    if nodata is None:
+        valid = ne.evaluate("den != 0")
+    else:
+        valid = ne.evaluate(
+            "(p != nodata) & (r != nodata) & (g != nodata) "
+            "& (b != nodata) & (i != nodata) & (den != 0)"
+        )
+
+    dnf = ne.evaluate("where(valid, (p - iw * i) / den, 0)")
+
+    for src, trg in ((r, ro), (g, go), (b, bo), (i, io)):
+        ne.evaluate(
+            "where(valid, src * dnf, fill)", 
+            out=trg, 
+            casting="same_kind"
+        )
@@ -1,26 +1,277 @@
-# simple mean
-Red_out= 0.5 * (Red_in + Pan_in)
-Green_out = 0.5 * (Green_in + Pan_in)
-Blue_out= 0.5 * (Blue_in + Pan_in)
-
-# Brovey transformation
-Red_out = Red_in / [(blue_in + green_in + red_in) * Pan]
-
-# adjusted Brovey
-DNF = (P - IW * I) / (RW * R + GW * G + BW * B)
-Red_out = R * DNF
-Green_out = G * DNF
-Blue_out = B * DNF
-Infrared_out = I * DNF
-
-P = panchromatic image
-R = red band
-G = green band
-B = blue band
-I = near infrared
-W = weight
-
-# intensity, hue, and saturation
-Intensity = P - I * IW
-
-# Gram-Schmidt
\ No newline at end of file
+from osgeo import gdal
+from xml.sax.saxutils import escape
+import numpy as np
+import os
+
+from bandio import _blocks, _creation_options, _open
+from kernels import _brovey_kernel
+
+
+def _warp_to(input_scene, ref_ds):
+
+    """
+    Function to resample a scene onto the grid of a reference
+    dataset with bilinear interpolation. The result is a warped 
+    VRT, so pixels are only resampled for the windows read from 
+    it and the full resampled scene is never held in memory.
+
+    Params
+    ------
+    input_scene : str
+        File path to Landsat scene (.TIF)
+
+    ref_ds : osgeo.gdal.Dataset
+        Dataset defining the target grid.
+
+    Returns
+    -------
+    osgeo.gdal.Dataset
+        Warped VRT dataset.
+    """
+
+    gt = ref_ds.GetGeoTransform()
+    xsize = ref_ds.RasterXSize
+    ysize = ref_ds.RasterYSize
+
+    # the bindings pass a failed open on to the warper, so check 
+    # the scene can be read first
+    _open(input_scene)
+
+    vrt_ds = gdal.Warp(
+        "", 
+        input_scene, 
+        format="VRT", 
+        outputBounds=(
+            gt[0], 
+            gt[3] + gt[5] * ysize, 
+            gt[0] + gt[1] * xsize, 
+            gt[3]
+        ),
+        width=xsize, 
+        height=ysize, 
+        dstSRS=ref_ds.GetProjection(), 
+        resampleAlg="bilinear"
+    )
+
+    # GDAL only logs failed warps
+    if vrt_ds is None:
+        raise RuntimeError(gdal.GetLastErrorMsg())
+
+    return vrt_ds
+
+
+def brovey(red_scene, green_scene, blue_scene, nir_scene, pan_scene, 
+           weights, output_scene):
+
+    """
+    Function to pansharpen Landsat multispectral bands with the 
+    adjusted Brovey transform. Multispectral bands are resampled
+    to the panchromatic grid, then
+
+        DNF = (P - IW * I) / (RW * R + GW * G + BW * B)
+
+    and each output band is the input band multiplied by DNF.
+
+    Params
+    ------
+    red_scene : str
+        File path to red band scene (.TIF)
+
+    green_scene : str
+        File path to green band scene (.TIF)
+
+    blue_scene : str
+        File path to blue band scene (.TIF)
+
+    nir_scene : str
+        File path to near infrared band scene (.TIF)
+
+    pan_scene : str
+        File path to panchromatic band scene (.TIF)
+
+    weights : tuple of float
+        Red, green, blue and near infrared weights.
+
+    output_scene : str
+        File path to output scene (.TIF), written with red, green,
+        blue and near infrared bands. File must not already exist.
+
+    Returns
+    -------
+    None
+    """
+
+    # ensure output does not already exist
+    if os.path.exists(output_scene):
+        raise ValueError(f"{output_scene} already exists!")
+
+    # open panchromatic dataset
+    pan_ds = _open(pan_scene)
+    pan_band = pan_ds.GetRasterBand(1)
+
+    # get panchromatic nodata value
+    no_data = pan_band.GetNoDataValue()
+
+    # align multispectral bands with the panchromatic grid, each
+    # block is resampled on the fly as it is read
+    ms_ds = [
+        _warp_to(scene, pan_ds) 
+        for scene in (red_scene, green_scene, blue_scene, nir_scene)
+    ]
+    ms_bands = [ds.GetRasterBand(1) for ds in ms_ds]
+
+    # create target dataset
+    drv = gdal.GetDriverByName("GTiff")
+    trg_ds = drv.Create(
+        output_scene, 
+        pan_ds.RasterXSize, 
+        pan_ds.RasterYSize, 
+        4, 
+        gdal.GDT_Float32,
+        options=_creation_options(gdal.GDT_Float32)
+    )
+
+    # set target metadata
+    trg_ds.SetGeoTransform(pan_ds.GetGeoTransform())
+    trg_ds.SetProjection(pan_ds.GetProjection())
+
+    # get target bands and set nodata values. Without one, the
+    # kernel gets None and skips the nodata comparisons entirely
+    trg_bands = [trg_ds.GetRasterBand(n) for n in range(1, 5)]
+
+    if no_data is None:
+        kernel_no_data = None
+    else:
+        for trg_band in trg_bands:
+            trg_band.SetNoDataValue(no_data)
+
+        kernel_no_data = np.float32(no_data)
+
+    # compute in float32
+    rw, gw, bw, iw = (np.float32(w) for w in weights)
+
+    # preallocate float32 block buffers, GDAL decodes each source
+    # block straight into them
+    bx, by = trg_bands[0].GetBlockSize()
+
+    pan_buf = np.empty((by, bx), dtype=np.float32)
+    ms_buf = np.empty((len(ms_bands), by, bx), dtype=np.float32)
+    trg_buf = np.empty((len(trg_bands), by, bx), dtype=np.float32)
+
+    # pansharpen block by block
+    for x, y, w, h in _blocks(pan_ds.RasterXSize, pan_ds.RasterYSize, bx, by):
+
+        # views on the buffers for edge blocks
+        pan_ar = pan_buf[:h, :w]
+        ms_ar = ms_buf[:, :h, :w]
+        trg_ar = trg_buf[:, :h, :w]
+
+        pan_band.ReadAsArray(x, y, w, h, buf_obj=pan_ar)
+        for band, ar in zip(ms_bands, ms_ar):
+            band.ReadAsArray(x, y, w, h, buf_obj=ar)
+
+        _brovey_kernel(*ms_ar, pan_ar, rw, gw, bw, iw, kernel_no_data, *trg_ar)
+
+        for trg_band, ar in zip(trg_bands, trg_ar):
+            trg_band.WriteArray(ar, x, y)
+
+    # close handles
+    trg_ds.FlushCache()
+    trg_ds = None
+    trg_bands = None
+    ms_ds = None
+    ms_bands = None
+    pan_ds = None
+    pan_band = None
+
+
+def weighted_brovey(ms_scenes, pan_scene, weights, output_scene):
+
+    """
+    Function to pansharpen Landsat multispectral bands with GDAL's
+    weighted Brovey transform. Unlike brovey, no pixels pass through
+    Python: a pansharpened VRT resamples the multispectral bands
+    to the panchromatic grid and computes
+
+        MS_out = MS * P / sum(W * MS)
+
+    in multi-threaded C++ as the output is written.
+
+    Params
+    ------
+    ms_scenes : list of str
+        File paths to multispectral band scenes (.TIF), in output
+        band order.
+
+    pan_scene : str
+        File path to panchromatic band scene (.TIF)
+
+    weights : tuple of float
+        Weight of each multispectral band in the pseudo 
+        panchromatic band.
+
+    output_scene : str
+        File path to output scene (.TIF), written with one band per
+        multispectral scene. File must not already exist.
+
+    Returns
+    -------
+    None
+    """
+
+    # ensure output does not already exist
+    if os.path.exists(output_scene):
+        raise ValueError(f"{output_scene} already exists!")
+
+    if len(weights) != len(ms_scenes):
+        raise ValueError("Weights must have one value per multispectral scene!")
+
+    # describe the pansharpened dataset
+    spectral = "".join(
+        f"<SpectralBand dstBand=\"{n}\">"
+        f"<SourceFilename relativeToVRT=\"0\">{escape(scene)}</SourceFilename>"
+        "<SourceBand>1</SourceBand>"
+        "</SpectralBand>"
+        for n, scene in enumerate(ms_scenes, start=1)
+    )
+    vrt_xml = (
+        "<VRTDataset subClass=\"VRTPansharpenedDataset\">"
+        "<PansharpeningOptions>"
+        "<Algorithm>WeightedBrovey</Algorithm>"
+        "<AlgorithmOptions>"
+        f"<Weights>{','.join(repr(float(w)) for w in weights)}</Weights>"
+        "</AlgorithmOptions>"
+        "<Resampling>Bilinear</Resampling>"
+        "<NumThreads>ALL_CPUS</NumThreads>"
+        "<PanchroBand>"
+        f"<SourceFilename relativeToVRT=\"0\">{escape(pan_scene)}</SourceFilename>"
+        "<SourceBand>1</SourceBand>"
+        "</PanchroBand>"
+        f"{spectral}"
+        "</PansharpeningOptions>"
+        "</VRTDataset>"
+    )
+
+    # open pansharpened dataset
+    vrt_ds = gdal.Open(vrt_xml)
+
+    # GDAL only logs failed opens, e.g. missing or mismatched scenes
+    if vrt_ds is None:
+        raise RuntimeError(gdal.GetLastErrorMsg())
+
+    # write tiled and compressed target dataset
+    trg_ds = gdal.Translate(
+        output_scene, 
+        vrt_ds, 
+        format="GTiff", 
+        outputType=gdal.GDT_Float32,
+        creationOptions=_creation_options(gdal.GDT_Float32)
+    )
+
+    # GDAL only logs failed reads and writes
+    if trg_ds is None:
+        raise RuntimeError(gdal.GetLastErrorMsg())
+
+    # close handles
+    trg_ds = None
+    vrt_ds = None
@@ -1,5 +1,4 @@
-from osgeo import gdal
-import os
+from bandio import _scale_band
 
 
 def gainbias(input_scene, gain, bias, output_scene):
@@ -11,8 +10,9 @@ def gainbias(input_scene, gain, bias, output_scene):
 
     Params
     ------
-    input_scene : str
-        File path to Landsat scene (.TIF)
+    input_scene : str or osgeo.gdal.Dataset
+        File path to Landsat scene (.TIF), or an open dataset 
+        backed by a file, which is reopened by name.
     
     gain : float
         Band specific rescaling gain factor (multiplicative).
@@ -29,53 +29,8 @@ def gainbias(input_scene, gain, bias, output_scene):
     None
     """
 
-    # ensure output does not already exist
-    if os.path.exists(output_scene):
-        raise ValueError(f"{output_scene} already exists!")
-    
-    # open source dataset
-    src_ds = gdal.Open(input_scene)
-    src_band = src_ds.GetRasterBand(1)
-
-    # get source nodata value
-    no_data = src_band.GetNoDataValue()
-
-    # read in source array
-    src_ar = src_band.ReadAsArray()
-
-    # create target dataset
-    drv = gdal.GetDriverByName("GTiff")
-    trg_ds = drv.Create(
-        output_scene, 
-        src_ds.RasterXSize, 
-        src_ds.RasterYSize, 
-        1, 
-        gdal.GDT_Float32
-    )
-
-    # set target metadata
-    trg_ds.SetGeoTransform(src_ds.GetGeoTransform())
-    trg_ds.SetProjection(src_ds.GetProjection())
-
-    # get target band
-    trg_band = trg_ds.GetRasterBand(1)
-
-    # set target nodata value
-    trg_band.SetNoDataValue(no_data)
-
     # convert to radiance
-    trg_ar = gain * src_ar + bias
-    trg_ar[src_ar == no_data] = no_data
-
-    # write radiance to band
-    trg_band.WriteArray(trg_ar)
-
-    # close handles
-    trg_ds.FlushCache()
-    trg_ds = None
-    trg_band = None
-    src_ds = None
-    src_band = None
+    _scale_band(input_scene, output_scene, gain, bias)
 
 
 def scaling(input_scene, lmin, lmax, qcalmin, qcalmax, output_scene):
@@ -87,8 +42,9 @@ def scaling(input_scene, lmin, lmax, qcalmin, qcalmax, output_scene):
 
     Params
     ------
-    input_scene : str
-        File path to Landsat scene (.TIF)
+    input_scene : str or osgeo.gdal.Dataset
+        File path to Landsat scene (.TIF), or an open dataset 
+        backed by a file, which is reopened by name.
     
     lmin : float
         Spectral radiance scale to qcalmin.
@@ -111,50 +67,8 @@ def scaling(input_scene, lmin, lmax, qcalmin, qcalmax, output_scene):
     None
     """
 
-    # ensure output does not already exist
-    if os.path.exists(output_scene):
-        raise ValueError(f"{output_scene} already exists!")
-    
-    # open source dataset
-    src_ds = gdal.Open(input_scene)
-    src_band = src_ds.GetRasterBand(1)
-
-    # get source nodata value
-    no_data = src_band.GetNoDataValue()
-
-    # read in source array
-    src_ar = src_band.ReadAsArray()
-
-    # create target dataset
-    drv = gdal.GetDriverByName("GTiff")
-    trg_ds = drv.Create(
-        output_scene, 
-        src_ds.RasterXSize, 
-        src_ds.RasterYSize, 
-        1, 
-        gdal.GDT_Float32
-    )
-
-    # set target metadata
-    trg_ds.SetGeoTransform(src_ds.GetGeoTransform())
-    trg_ds.SetProjection(src_ds.GetProjection())
-
-    # get target band
-    trg_band = trg_ds.GetRasterBand(1)
-
-    # set target nodata value
-    trg_band.SetNoDataValue(no_data)
-
-    # convert to radiance
-    trg_ar = ((lmax - lmin)/(qcalmax - qcalmin)) * (src_ar - qcalmin) + lmin
-    trg_ar[src_ar == no_data] = no_data
-
-    # write radiance to band
-    trg_band.WriteArray(trg_ar)
+    # convert to radiance, folding the scaling into a gain and bias
+    gain = (lmax - lmin)/(qcalmax - qcalmin)
+    bias = lmin - gain * qcalmin
 
-    # close handles
-    trg_ds.FlushCache()
-    trg_ds = None
-    trg_band = None
-    src_ds = None
-    src_band = None
\ No newline at end of file
+    _scale_band(input_scene, output_scene, gain, bias)
@@ -1,6 +1,6 @@
-from osgeo import gdal
 import numpy as np
-import os
+
+from bandio import _scale_band
 
 
 def gainbias(input_scene, gain, bias, sun_elev, output_scene):
@@ -12,8 +12,9 @@ def gainbias(input_scene, gain, bias, sun_elev, output_scene):
 
     Params
     ------
-    input_scene : str
-        File path to Landsat scene (.TIF)
+    input_scene : str or osgeo.gdal.Dataset
+        File path to Landsat scene (.TIF), or an open dataset 
+        backed by a file, which is reopened by name.
     
     gain : float
         Band specific rescaling gain factor (multiplicative).
@@ -33,57 +34,11 @@ def gainbias(input_scene, gain, bias, sun_elev, output_scene):
     None
     """
 
-    # ensure output does not already exist
-    if os.path.exists(output_scene):
-        raise ValueError(f"{output_scene} already exists!")
-    
-    # open source dataset
-    src_ds = gdal.Open(input_scene)
-    src_band = src_ds.GetRasterBand(1)
-
-    # get source nodata value
-    no_data = src_band.GetNoDataValue()
-
-    # read in source array
-    src_ar = src_band.ReadAsArray()
-
-    # create target dataset
-    drv = gdal.GetDriverByName("GTiff")
-    trg_ds = drv.Create(
-        output_scene, 
-        src_ds.RasterXSize, 
-        src_ds.RasterYSize, 
-        1, 
-        gdal.GDT_Float32
-    )
-
-    # set target metadata
-    trg_ds.SetGeoTransform(src_ds.GetGeoTransform())
-    trg_ds.SetProjection(src_ds.GetProjection())
-
-    # get target band
-    trg_band = trg_ds.GetRasterBand(1)
-
-    # set target nodata value
-    trg_band.SetNoDataValue(no_data)
-
-    # convert to relectance
-    trg_ar = gain * src_ar + bias
-
-    # correct for sun elevation angle
-    trg_ar = trg_ar / np.sin(np.radians(sun_elev))
-
-    trg_ar[src_ar == no_data] = no_data
-
-    # write radiance to band
-    trg_band.WriteArray(trg_ar)
+    # convert to relectance and correct for sun elevation angle,
+    # folding the correction into the gain and bias
+    sin_elev = np.sin(np.radians(sun_elev))
 
-    # close handles
-    trg_ds.FlushCache()
-    trg_ds = None
-    trg_band = None
-    src_ds = None
-    src_band = None
+    _scale_band(input_scene, output_scene, gain / sin_elev, bias / sin_elev)
 
 
 def ref(input_scene, earth_sun_dist, sun_elev, esun, output_scene):
@@ -94,8 +49,9 @@ def ref(input_scene, earth_sun_dist, sun_elev, esun, output_scene):
 
     Params
     ------
-    input_scene : str
-        File path to Landsat scene (.TIF)
+    input_scene : str or osgeo.gdal.Dataset
+        File path to Landsat scene (.TIF), or an open dataset 
+        backed by a file, which is reopened by name.
     
     earth_sun_dist : float
         Earth-Sun distance in astronomical units.
@@ -115,57 +71,12 @@ def ref(input_scene, earth_sun_dist, sun_elev, esun, output_scene):
     None
     """
 
-    # ensure output does not already exist
-    if os.path.exists(output_scene):
-        raise ValueError(f"{output_scene} already exists!")
-    
-    # open source dataset
-    src_ds = gdal.Open(input_scene)
-    src_band = src_ds.GetRasterBand(1)
-
-    # get source nodata value
-    no_data = src_band.GetNoDataValue()
-
-    # read in source array
-    src_ar = src_band.ReadAsArray()
-
-    # create target dataset
-    drv = gdal.GetDriverByName("GTiff")
-    trg_ds = drv.Create(
-        output_scene, 
-        src_ds.RasterXSize, 
-        src_ds.RasterYSize, 
-        1, 
-        gdal.GDT_Float32
-    )
-
-    # set target metadata
-    trg_ds.SetGeoTransform(src_ds.GetGeoTransform())
-    trg_ds.SetProjection(src_ds.GetProjection())
-
-    # get target band
-    trg_band = trg_ds.GetRasterBand(1)
-
-    # set target nodata value
-    trg_band.SetNoDataValue(no_data)
-
-    # convert to relectance
-    solar_zenith = 90 - sun_elev
-
-    trg_ar = (np.pi * src_ar * earth_sun_dist**2) / esun * np.cos(np.radians(solar_zenith))
-
-    # correct for sun elevation angle
-    if sun_elev:
-        trg_ar = trg_ar / np.sin(np.radians(sun_elev))
-
-    trg_ar[src_ar == no_data] = no_data
+    # convert to relectance. cos(solar zenith) and the sun elevation
+    # correction sin(sun elevation) cancel, leaving a single scalar
+    coeff = np.pi * earth_sun_dist**2 / esun
 
-    # write radiance to band
-    trg_band.WriteArray(trg_ar)
+    # without a sun elevation correction only cos(90) remains
+    if not sun_elev:
+        coeff = coeff * np.cos(np.radians(90 - sun_elev))
 
-    # close handles
-    trg_ds.FlushCache()
-    trg_ds = None
-    trg_band = None
-    src_ds = None
-    src_band = None
\ No newline at end of file
+    _scale_band(input_scene, output_scene, coeff, 0)
@@ -0,0 +1,131 @@
+import datetime
+
+import numpy as np
+import pytest
+
+import au
+
+
+FORMULAS = ["Meeus", "Spencer", "Mather", "ESA", "Duffie"]
+
+
+def _reference(date, formula):
+
+    # the scalar implementation the vectorized formulas replaced
+    doy = date.timetuple().tm_yday
+
+    if formula == "Meeus":
+        if date.month <= 2:
+            year = date.year - 1
+            month = date.month + 12
+        else:
+            year = date.year
+            month = date.month
+
+        day = date.day
+        ut = date.hour + (date.minute/60) + (date.second/3600)
+
+        a = int(year/100)
+        b = 2 - a + int(a/4)
+
+        jd = int(365.25 * (year + 4716)) + int(30.6001 * (month + 1)) \
+            + day + (ut/24.0) + b - 1524.5
+        d = jd - 2451545.0
+        g = np.radians(357.529 + 0.98560028 * d)
+
+        return 1.00014 - 0.01671 * np.cos(g) - 0.00014 * np.cos(2*g)
+
+    elif formula == "Spencer":
+        p = 2 * np.pi * (doy - 1) / 365
+        return (1/(1.000110 + 0.034221 * np.cos(p) + 0.001280 * np.sin(p) \
+            + 0.000719 * np.cos(2 * p) + 0.000077 * np.sin(2 * p)))**0.5
+
+    elif formula == "Mather":
+        return 1/(1 - 0.016729 * np.cos(0.9856 * (doy - 4)))
+
+    elif formula == "ESA":
+        return 1 - 0.016729 * np.cos((2 * np.pi) * (0.9856 * (doy - 4) / 360))
+
+    elif formula == "Duffie":
+        return 1 + 0.033 * np.cos(doy * 2 * np.pi / 365)
+
+
+@pytest.fixture(scope="module")
+def dates():
+
+    # random dates to the second, 1950 to 2050
+    rng = np.random.default_rng(0)
+    start = datetime.datetime(1950, 1, 1)
+    seconds = rng.integers(0, 100 * 365 * 86400, size=3000)
+    return [start + datetime.timedelta(seconds=int(s)) for s in seconds]
+
+
+@pytest.mark.parametrize("formula", FORMULAS)
+def test_scalar_parity(dates, formula):
+    for date in dates:
+        assert au.earth_sun_dist(date, formula) == pytest.approx(
+            _reference(date, formula), rel=0, abs=1e-12
+        )
+
+
+@pytest.mark.parametrize("formula", FORMULAS)
+def test_array_matches_scalar(dates, formula):
+    ar = np.array(dates, dtype="datetime64[s]")
+    dist = au.earth_sun_dist(ar, formula)
+    assert dist.shape == ar.shape
+    np.testing.assert_allclose(
+        dist, [au.earth_sun_dist(date, formula) for date in dates], rtol=0, atol=1e-12
+    )
+
+
+def test_timezone_aware_uses_wall_clock():
+    date = datetime.datetime(2020, 1, 15, 23, 0)
+    aware = date.replace(tzinfo=datetime.timezone(datetime.timedelta(hours=5)))
+    assert au.earth_sun_dist(aware) == au.earth_sun_dist(date)
+
+
+@pytest.mark.parametrize("formula", FORMULAS)
+def test_nat(formula):
+    assert np.isnan(au.earth_sun_dist(np.datetime64("NaT"), formula))
+
+    dist = au.earth_sun_dist(
+        np.array(["2020-06-01T10:00", "NaT"], dtype="datetime64[s]"), formula
+    )
+    assert np.isfinite(dist[0])
+    assert np.isnan(dist[1])
+
+
+def test_callable_formula():
+    date = datetime.datetime(2020, 3, 2)
+    dist = au.earth_sun_dist(date, lambda dates, doy: doy.astype(float))
+    assert dist == 62.0
+
+
+def test_unknown_formula_raises():
+    with pytest.raises(ValueError):
+        au.earth_sun_dist(datetime.datetime(2020, 1, 1), "Kepler")
+    with pytest.raises(ValueError):
+        au.earth_sun_dist(np.array(["2020-01-01"], dtype="datetime64[s]"), "Kepler")
+
+
+def test_invalid_date_raises():
+    with pytest.raises(TypeError):
+        au.earth_sun_dist("2020-01-01")
+
+
+class _Formula:
+
+    # defines __eq__ without __hash__, so instances are unhashable
+    def __eq__(self, other):
+        return isinstance(other, _Formula)
+
+    def __call__(self, dates, doy):
+        return np.ones(dates.shape)
+
+
+def test_unhashable_formula():
+    date = datetime.datetime(2020, 6, 1, 10, 30)
+    assert au.earth_sun_dist(date, _Formula()) == 1.0
+    np.testing.assert_array_equal(
+        au.earth_sun_dist(np.array([np.datetime64(date)]), _Formula()), [1.0]
+    )
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+gdal = pytest.importorskip("osgeo.gdal")
+
+import batch
+import toar
+
+
+def _write(path, seed):
+
+    rng = np.random.default_rng(seed)
+    ar = rng.integers(1, 65535, size=(300, 300), dtype=np.uint16)
+    ar[:10, :] = 0
+
+    ds = gdal.GetDriverByName("GTiff").Create(
+        path, 300, 300, 1, gdal.GDT_UInt16
+    )
+    ds.SetGeoTransform((300000, 30, 0, 4000000, 0, -30))
+    ds.GetRasterBand(1).SetNoDataValue(0)
+    ds.GetRasterBand(1).WriteArray(ar)
+    ds = None
+
+
+def test_calibrate_scene(tmp_path):
+
+    b4 = str(tmp_path / "B4.TIF")
+    b10 = str(tmp_path / "B10.TIF")
+    _write(b4, 0)
+    _write(b10, 1)
+
+    # parallel conversions in worker processes
+    batch.calibrate_scene(
+        [
+            {
+                "method": "toa_radiance", "input_scene": b4, 
+                "gain": 0.012, "bias": -60.1, 
+                "output_scene": str(tmp_path / "B4_rad.TIF"),
+            },
+            {
+                "method": "toa_brightness", "input_scene": b10, 
+                "k1": 774.8853, "k2": 1321.0789, 
+                "output_scene": str(tmp_path / "B10_bt.TIF"),
+            },
+        ],
+        workers=2,
+    )
+
+    # the same conversions run serially
+    toar.toa_radiance(b4, 0.012, -60.1, str(tmp_path / "B4_ref.TIF"))
+    toar.toa_brightness(b10, 774.8853, 1321.0789, str(tmp_path / "B10_ref.TIF"))
+
+    for name, ref in (("B4_rad", "B4_ref"), ("B10_bt", "B10_ref")):
+        out = gdal.Open(str(tmp_path / f"{name}.TIF")).GetRasterBand(1)
+        expected = gdal.Open(str(tmp_path / f"{ref}.TIF")).GetRasterBand(1)
+        assert out.GetNoDataValue() == expected.GetNoDataValue()
+        np.testing.assert_array_equal(out.ReadAsArray(), expected.ReadAsArray())
+
+
+def test_calibrate_scene_unknown_method(tmp_path):
+
+    with pytest.raises(ValueError):
+        batch.calibrate_scene(
+            [{"method": "toa_magic", "output_scene": str(tmp_path / "out.TIF")}], 
+            workers=2,
+        )
+
+    # nothing runs when any method is unknown
+    assert not (tmp_path / "out.TIF").exists()
@@ -0,0 +1,178 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import numpy as np
+import pytest
+
+import kernels
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_concurrent_kernels():
+
+    numba = pytest.importorskip("numba")
+    if kernels.BACKEND != "numba":
+        pytest.skip("parallel Numba kernels not in use")
+
+    kernels.require_threadsafe()
+    assert numba.threading_layer() != "workqueue"
+
+    src = np.random.default_rng(0).uniform(1, 65535, (512, 512)).astype(np.float32)
+    args = (np.float32(3.3e-4), np.float32(0.1), np.float32(774.89), np.float32(1321.08))
+    expected = np.empty_like(src)
+    kernels._bright_kernel(src, *args, None, expected)
+
+    def task():
+        kernels.set_num_threads(1)
+        out = np.empty_like(src)
+        kernels._bright_kernel(src, *args, None, out)
+        return out
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        futures = [ex.submit(task) for _ in range(16)]
+        for future in futures:
+            np.testing.assert_array_equal(future.result(), expected)
+
+
+def test_require_threadsafe_unavailable():
+
+    pytest.importorskip("numba")
+    if kernels.BACKEND != "numba":
+        pytest.skip("parallel Numba kernels not in use")
+
+    import subprocess
+    import sys
+
+    # threads launch once per process, so block the threadsafe
+    # layers in a fresh interpreter
+    script = (
+        "import sys\n"
+        "sys.modules['numba.np.ufunc.omppool'] = None\n"
+        "sys.modules['numba.np.ufunc.tbbpool'] = None\n"
+        "import numba, numpy as np, kernels\n"
+        "try:\n"
+        "    kernels.require_threadsafe()\n"
+        "except RuntimeError:\n"
+        "    pass\n"
+        "else:\n"
+        "    sys.exit('no RuntimeError')\n"
+        "assert numba.config.THREADING_LAYER == 'default'\n"
+        "src = np.ones((4, 4), dtype=np.float32)\n"
+        "out = np.empty_like(src)\n"
+        "f = np.float32\n"
+        "kernels._bright_kernel(src, f(1), f(0), f(774.89), f(1321.08), None, out)\n"
+        "assert numba.threading_layer() == 'workqueue'\n"
+    )
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("NUMBA_THREADING_LAYER", None)
+    result = subprocess.run(
+        [sys.executable, "-c", script], env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.fixture(scope="session")
+def aot(tmp_path_factory):
+
+    pytest.importorskip("numba.pycc")
+
+    import importlib.util
+    import shutil
+    import subprocess
+    import sys
+
+    # build the extension in a scratch copy, not next to the sources
+    build_dir = tmp_path_factory.mktemp("aot")
+    src = os.path.join(ROOT, "kernels_aot.py")
+    shutil.copy(src, build_dir)
+    subprocess.run(
+        [sys.executable, "kernels_aot.py"], cwd=build_dir, check=True
+    )
+
+    sys.path.insert(0, str(build_dir))
+    try:
+        spec = importlib.util.spec_from_file_location(
+            "kernels_aot_built", build_dir / "kernels_aot.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(str(build_dir))
+
+    return module
+
+
+def _blocks(shape, n):
+
+    # the last block is brighter, like a panchromatic band, so the
+    # Brovey detail factor never cancels to near zero
+    rng = np.random.default_rng(0)
+    blocks = [rng.uniform(1, 20000, shape).astype(np.float32) for _ in range(n)]
+    blocks[-1] += 20000
+    for block in blocks:
+        block[0, :8] = 0
+    return blocks
+
+
+@pytest.mark.parametrize("nodata", [None, np.float32(0)])
+def test_aot_bright_parity(aot, nodata):
+
+    kernels_numba = pytest.importorskip("kernels_numba")
+
+    (src,) = _blocks((64, 64), 1)
+    args = (np.float32(3.3e-4), np.float32(0.1), np.float32(774.89), np.float32(1321.08))
+
+    # radiance of exactly zero
+    src[1, 1] = 1
+    zero_args = (np.float32(1), np.float32(-1)) + args[2:]
+
+    for gain_bias in (args, zero_args):
+        expected = np.empty_like(src)
+        out = np.empty_like(src)
+        kernels_numba._bright_kernel(src, *gain_bias, nodata, expected)
+        aot._bright_kernel(src, *gain_bias, nodata, out)
+        np.testing.assert_allclose(out, expected, rtol=1e-5, equal_nan=True)
+
+
+@pytest.mark.parametrize("nodata", [None, np.float32(0)])
+def test_aot_brovey_parity(aot, nodata):
+
+    kernels_numba = pytest.importorskip("kernels_numba")
+
+    bands = _blocks((64, 64), 5)
+    weights = (np.float32(0.42), np.float32(0.51), np.float32(0.07), np.float32(0.3))
+
+    expected = [np.empty_like(bands[0]) for _ in range(4)]
+    out = [np.empty_like(bands[0]) for _ in range(4)]
+    kernels_numba._brovey_kernel(*bands, *weights, nodata, *expected)
+    aot._brovey_kernel(*bands, *weights, nodata, *out)
+
+    for o, e in zip(out, expected):
+        np.testing.assert_allclose(o, e, rtol=1e-5)
+
+
+@pytest.mark.parametrize("nodata", [None, np.float32(0)])
+def test_numexpr_parity(nodata):
+
+    kernels_numba = pytest.importorskip("kernels_numba")
+    pytest.importorskip("numexpr")
+    import kernels_numexpr
+
+    (src,) = _blocks((64, 64), 1)
+    args = (np.float32(3.3e-4), np.float32(0.1), np.float32(774.89), np.float32(1321.08))
+    expected = np.empty_like(src)
+    out = np.empty_like(src)
+    kernels_numba._bright_kernel(src, *args, nodata, expected)
+    kernels_numexpr._bright_kernel(src, *args, nodata, out)
+    np.testing.assert_allclose(out, expected, rtol=1e-5)
+
+    bands = _blocks((64, 64), 5)
+    weights = (np.float32(0.42), np.float32(0.51), np.float32(0.07), np.float32(0.3))
+    expected = [np.empty_like(bands[0]) for _ in range(4)]
+    out = [np.empty_like(bands[0]) for _ in range(4)]
+    kernels_numba._brovey_kernel(*bands, *weights, nodata, *expected)
+    kernels_numexpr._brovey_kernel(*bands, *weights, nodata, *out)
+    for o, e in zip(out, expected):
+        np.testing.assert_allclose(o, e, rtol=1e-5)
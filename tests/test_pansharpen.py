@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+gdal = pytest.importorskip("osgeo.gdal")
+
+import pansharpen
+
+
+def _write(path, ar, res):
+
+    ds = gdal.GetDriverByName("GTiff").Create(
+        path, ar.shape[1], ar.shape[0], 1, gdal.GDT_UInt16
+    )
+    ds.SetGeoTransform((300000, res, 0, 4000000, 0, -res))
+    ds.GetRasterBand(1).WriteArray(ar)
+    ds = None
+
+
+def test_weighted_brovey(tmp_path):
+
+    # constant multispectral bands resample to the same constant,
+    # so the expected output only depends on the pan band
+    rng = np.random.default_rng(0)
+    pan = rng.integers(1, 65535, size=(300, 300), dtype=np.uint16)
+    _write(str(tmp_path / "pan.TIF"), pan, 15)
+
+    values = (1000, 2000, 3000)
+    ms_scenes = []
+    for n, value in enumerate(values):
+        path = str(tmp_path / f"ms{n}.TIF")
+        _write(path, np.full((150, 150), value, dtype=np.uint16), 30)
+        ms_scenes.append(path)
+
+    weights = (0.4, 0.3, 0.3)
+    out = str(tmp_path / "out.TIF")
+    pansharpen.weighted_brovey(ms_scenes, str(tmp_path / "pan.TIF"), weights, out)
+
+    ds = gdal.Open(out)
+    assert ds.RasterCount == len(values)
+    assert (ds.RasterXSize, ds.RasterYSize) == (300, 300)
+
+    pseudo = sum(w * v for w, v in zip(weights, values))
+    for n, value in enumerate(values, start=1):
+        np.testing.assert_allclose(
+            ds.GetRasterBand(n).ReadAsArray(), 
+            value * pan.astype(np.float64) / pseudo, 
+            rtol=1e-5
+        )
+
+
+def test_weighted_brovey_missing_scene_raises(tmp_path):
+
+    with pytest.raises(RuntimeError):
+        pansharpen.weighted_brovey(
+            [str(tmp_path / "ms.TIF")], 
+            str(tmp_path / "pan.TIF"), 
+            (1.0,), 
+            str(tmp_path / "out.TIF")
+        )
+
+
+@pytest.mark.parametrize("missing", ["red", "pan"])
+def test_brovey_missing_scene_raises(tmp_path, missing):
+
+    scenes = {}
+    for name in ("red", "green", "blue", "nir", "pan"):
+        path = str(tmp_path / f"{name}.TIF")
+        if name != missing:
+            _write(path, np.ones((30, 30), dtype=np.uint16), 30)
+        scenes[name] = path
+
+    with pytest.raises(RuntimeError):
+        pansharpen.brovey(
+            scenes["red"], 
+            scenes["green"], 
+            scenes["blue"], 
+            scenes["nir"], 
+            scenes["pan"], 
+            (0.42, 0.51, 0.07, 0.3), 
+            str(tmp_path / "out.TIF")
+        )
+
+
+@pytest.mark.parametrize("values", [(1000, 2000, 3000, 500), (0, 0, 0, 500)])
+def test_brovey(tmp_path, values):
+
+    # constant multispectral bands resample to the same constant,
+    # the 300x300 pan band straddles the 256x256 output blocks
+    no_data = 65535
+    rng = np.random.default_rng(0)
+    pan = rng.integers(1000, 60000, size=(300, 300), dtype=np.uint16)
+    pan[:5, :] = no_data
+    pan[280, 270] = no_data
+
+    pan_scene = str(tmp_path / "pan.TIF")
+    _write(pan_scene, pan, 15)
+    ds = gdal.Open(pan_scene, gdal.GA_Update)
+    ds.GetRasterBand(1).SetNoDataValue(no_data)
+    ds = None
+
+    ms_scenes = []
+    for name, value in zip(("red", "green", "blue", "nir"), values):
+        path = str(tmp_path / f"{name}.TIF")
+        _write(path, np.full((150, 150), value, dtype=np.uint16), 30)
+        ms_scenes.append(path)
+
+    weights = (0.42, 0.51, 0.07, 0.3)
+    out = str(tmp_path / "out.TIF")
+    pansharpen.brovey(*ms_scenes, pan_scene, weights, out)
+
+    ds = gdal.Open(out)
+    assert ds.RasterCount == 4
+    assert (ds.RasterXSize, ds.RasterYSize) == (300, 300)
+
+    rw, gw, bw, iw = weights
+    r, g, b, i = values
+    den = rw * r + gw * g + bw * b
+
+    # nodata and zero denominator pixels are filled with nodata
+    invalid = np.full(pan.shape, den == 0) | (pan == no_data)
+
+    for n, value in enumerate(values, start=1):
+        band = ds.GetRasterBand(n)
+        ar = band.ReadAsArray()
+
+        assert band.GetNoDataValue() == no_data
+        assert (ar[invalid] == no_data).all()
+
+        if den != 0:
+            expected = (pan.astype(np.float64) - iw * i) / den * value
+            np.testing.assert_allclose(ar[~invalid], expected[~invalid], rtol=1e-5)
@@ -0,0 +1,282 @@
+import numpy as np
+import pytest
+
+gdal = pytest.importorskip("osgeo.gdal")
+
+import brightness
+import radiance
+import reflectance
+import toar
+
+
+NO_DATA = 0
+
+# Landsat 8 band 10 thermal constants
+K1 = 774.8853
+K2 = 1321.0789
+
+
+@pytest.fixture
+def dn(tmp_path):
+
+    # 300x300 spans several 256x256 output tiles, with nodata pixels
+    rng = np.random.default_rng(0)
+    ar = rng.integers(1, 65535, size=(300, 300), dtype=np.uint16)
+    ar[:10, :] = NO_DATA
+    ar[150, 150] = NO_DATA
+
+    path = str(tmp_path / "dn.TIF")
+    ds = gdal.GetDriverByName("GTiff").Create(
+        path, 300, 300, 1, gdal.GDT_UInt16
+    )
+    ds.SetGeoTransform((300000, 30, 0, 4000000, 0, -30))
+    ds.GetRasterBand(1).SetNoDataValue(NO_DATA)
+    ds.GetRasterBand(1).WriteArray(ar)
+    ds = None
+
+    return path, ar
+
+
+def _check(output_scene, src_ar, expected):
+
+    ds = gdal.Open(output_scene)
+    band = ds.GetRasterBand(1)
+    out = band.ReadAsArray()
+
+    assert band.GetNoDataValue() == NO_DATA
+    assert ds.GetGeoTransform() == (300000, 30, 0, 4000000, 0, -30)
+
+    mask = src_ar == NO_DATA
+    assert (out[mask] == NO_DATA).all()
+    np.testing.assert_allclose(out[~mask], expected[~mask], rtol=1e-5)
+
+
+def test_toa_radiance(dn, tmp_path):
+    path, ar = dn
+    out = str(tmp_path / "out.TIF")
+    toar.toa_radiance(path, 0.012, -60.1, out)
+    _check(out, ar, 0.012 * ar + -60.1)
+
+
+def test_toa_reflectance(dn, tmp_path):
+    path, ar = dn
+    out = str(tmp_path / "out.TIF")
+    toar.toa_reflectance(path, 2e-5, -0.1, out)
+    _check(out, ar, 2e-5 * ar + -0.1)
+
+
+def test_radiance_gainbias(dn, tmp_path):
+    path, ar = dn
+    out = str(tmp_path / "out.TIF")
+    radiance.gainbias(path, 0.012, -60.1, out)
+    _check(out, ar, 0.012 * ar + -60.1)
+
+
+def test_radiance_scaling(dn, tmp_path):
+    path, ar = dn
+    out = str(tmp_path / "out.TIF")
+    radiance.scaling(path, -1.5, 193.0, 1, 65535, out)
+    _check(out, ar, ((193.0 - -1.5)/(65535 - 1)) * (ar - 1.0) + -1.5)
+
+
+def test_reflectance_gainbias(dn, tmp_path):
+    path, ar = dn
+    out = str(tmp_path / "out.TIF")
+    reflectance.gainbias(path, 2e-5, -0.1, 45.0, out)
+    _check(out, ar, (2e-5 * ar + -0.1) / np.sin(np.radians(45.0)))
+
+
+def test_reflectance_ref(dn, tmp_path):
+    path, ar = dn
+    out = str(tmp_path / "out.TIF")
+    reflectance.ref(path, 1.0141, 45.0, 1536.0, out)
+    expected = (np.pi * ar * 1.0141**2) / 1536.0 \
+        * np.cos(np.radians(90 - 45.0)) / np.sin(np.radians(45.0))
+    _check(out, ar, expected)
+
+
+def test_missing_source_raises(tmp_path):
+    with pytest.raises(RuntimeError):
+        toar.toa_radiance(str(tmp_path / "missing.TIF"), 1, 0, str(tmp_path / "out.TIF"))
+
+
+def test_configure_gdal_cachemax(dn):
+
+    from bandio import configure_gdal
+
+    # the block cache is already in use after reading a scene
+    path, _ = dn
+    gdal.Open(path).ReadAsArray()
+
+    old = gdal.GetCacheMax()
+    try:
+        configure_gdal(GDAL_CACHEMAX="64")
+        assert gdal.GetCacheMax() == 64 * 1024**2
+    finally:
+        gdal.SetCacheMax(old)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("64", 64 * 1024**2),
+    ("99999", 99999 * 1024**2),
+    ("100000", 100000),
+    ("1GB", 1024**3),
+    ("512mb", 512 * 1024**2),
+])
+def test_cache_max(value, expected):
+    from bandio import _cache_max
+    assert _cache_max(value) == expected
+
+
+def test_cache_max_percentage():
+    from bandio import _cache_max
+    assert _cache_max("25%") == int(gdal.GetUsablePhysicalRAM() * 25 / 100)
+
+
+@pytest.mark.parametrize("value", ["lots", "-1", "1PB"])
+def test_cache_max_invalid(value):
+    from bandio import _cache_max
+    with pytest.raises(ValueError):
+        _cache_max(value)
+
+
+def test_import_keeps_cache_max():
+
+    import os
+    import subprocess
+    import sys
+
+    # a cache size set before the first import is not overridden
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = (
+        "from osgeo import gdal\n"
+        "gdal.SetCacheMax(123 * 1024**2)\n"
+        "import bandio\n"
+        "assert gdal.GetCacheMax() == 123 * 1024**2, gdal.GetCacheMax()\n"
+    )
+    env = dict(os.environ, PYTHONPATH=root)
+    env.pop("GDAL_CACHEMAX", None)
+    result = subprocess.run(
+        [sys.executable, "-c", script], env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_open_dataset(dn, tmp_path):
+    path, ar = dn
+    out = str(tmp_path / "out.TIF")
+    toar.toa_radiance(gdal.Open(path), 0.012, -60.1, out)
+    _check(out, ar, 0.012 * ar + -60.1)
+
+
+def test_mem_dataset_raises(dn, tmp_path):
+    path, _ = dn
+    mem_ds = gdal.GetDriverByName("MEM").CreateCopy("", gdal.Open(path))
+    with pytest.raises(ValueError):
+        toar.toa_radiance(mem_ds, 0.012, -60.1, str(tmp_path / "out.TIF"))
+
+
+def test_toa_radiance_scene(tmp_path):
+
+    # three bands, each with its own nodata value
+    rng = np.random.default_rng(0)
+    no_data = (0, 1, 2)
+    ars = rng.integers(10, 65535, size=(3, 300, 300), dtype=np.uint16)
+    for ar, value in zip(ars, no_data):
+        ar[:10, :] = value
+
+    path = str(tmp_path / "multi.TIF")
+    ds = gdal.GetDriverByName("GTiff").Create(
+        path, 300, 300, 3, gdal.GDT_UInt16
+    )
+    ds.SetGeoTransform((300000, 30, 0, 4000000, 0, -30))
+    for n, (ar, value) in enumerate(zip(ars, no_data), start=1):
+        ds.GetRasterBand(n).SetNoDataValue(value)
+        ds.GetRasterBand(n).WriteArray(ar)
+    ds = None
+
+    # output bands follow the dict order, not the band numbers
+    band_params = {3: (0.03, -3.0), 1: (0.01, -1.0)}
+    out = str(tmp_path / "out.TIF")
+    toar.toa_radiance_scene(path, band_params, out)
+
+    ds = gdal.Open(out)
+    assert ds.RasterCount == len(band_params)
+
+    for n, (src_n, (gain, bias)) in enumerate(band_params.items(), start=1):
+        band = ds.GetRasterBand(n)
+        out_ar = band.ReadAsArray()
+        src_ar = ars[src_n - 1]
+        value = no_data[src_n - 1]
+
+        assert band.GetNoDataValue() == value
+
+        mask = src_ar == value
+        assert (out_ar[mask] == value).all()
+        np.testing.assert_allclose(
+            out_ar[~mask], gain * src_ar[~mask] + bias, rtol=1e-5
+        )
+
+
+def test_vsimem_dataset(dn, tmp_path):
+
+    # open datasets on /vsi file systems are reopened by name too
+    path, ar = dn
+    vsi_path = "/vsimem/dn.TIF"
+    gdal.GetDriverByName("GTiff").CreateCopy(vsi_path, gdal.Open(path))
+    try:
+        out = str(tmp_path / "out.TIF")
+        toar.toa_radiance(gdal.Open(vsi_path), 0.012, -60.1, out)
+        _check(out, ar, 0.012 * ar + -60.1)
+    finally:
+        gdal.Unlink(vsi_path)
+
+
+def _radiance(path, no_data):
+
+    # float32 thermal radiance, nodata pixels only with a nodata value
+    rng = np.random.default_rng(0)
+    ar = rng.uniform(5, 15, size=(300, 300)).astype(np.float32)
+
+    ds = gdal.GetDriverByName("GTiff").Create(
+        path, 300, 300, 1, gdal.GDT_Float32
+    )
+    ds.SetGeoTransform((300000, 30, 0, 4000000, 0, -30))
+    if no_data is not None:
+        ar[:10, :] = no_data
+        ds.GetRasterBand(1).SetNoDataValue(no_data)
+    ds.GetRasterBand(1).WriteArray(ar)
+    ds = None
+
+    return ar
+
+
+def test_toa_brightness(tmp_path):
+    path = str(tmp_path / "rad.TIF")
+    ar = _radiance(path, NO_DATA)
+    out = str(tmp_path / "out.TIF")
+    toar.toa_brightness(path, K1, K2, out)
+    _check(out, ar, K2 / np.log(K1 / ar.astype(np.float64) + 1))
+
+
+def test_toa_rad_to_toa_bright_without_nodata(tmp_path):
+
+    # the target gets no nodata value and every pixel is converted
+    path = str(tmp_path / "rad.TIF")
+    ar = _radiance(path, None)
+    out = str(tmp_path / "out.TIF")
+    brightness.toa_rad_to_toa_bright(path, K1, K2, out)
+
+    band = gdal.Open(out).GetRasterBand(1)
+    assert band.GetNoDataValue() is None
+    np.testing.assert_allclose(
+        band.ReadAsArray(), K2 / np.log(K1 / ar.astype(np.float64) + 1), rtol=1e-5
+    )
+
+
+def test_dn_to_toa_bright(dn, tmp_path):
+    path, ar = dn
+    out = str(tmp_path / "out.TIF")
+    brightness.dn_to_toa_bright(path, 3.342e-4, 0.1, K1, K2, out)
+    rad = 3.342e-4 * ar.astype(np.float64) + 0.1
+    _check(out, ar, K2 / np.log(K1 / rad + 1))
@@ -1,6 +1,7 @@
-from osgeo import gdal
 import numpy as np
-import os
+
+from bandio import _map_band, _scale_band, _scale_bands
+from kernels import _bright_kernel
 
 
 def toa_radiance(input_scene, gain, bias, output_scene):
@@ -10,8 +11,9 @@ def toa_radiance(input_scene, gain, bias, output_scene):
 
     Params
     ------
-    input_scene : str
-        File path to Landsat scene (.TIF)
+    input_scene : str or osgeo.gdal.Dataset
+        File path to Landsat scene (.TIF), or an open dataset 
+        backed by a file, which is reopened by name.
     
     gain : float
         Band specific rescaling gain factor (multiplicative).
@@ -28,53 +30,8 @@ def toa_radiance(input_scene, gain, bias, output_scene):
     None
     """
 
-    # ensure output does not already exist
-    if os.path.exists(output_scene):
-        raise ValueError(f"{output_scene} already exists!")
-    
-    # open source dataset
-    src_ds = gdal.Open(input_scene)
-    src_band = src_ds.GetRasterBand(1)
-
-    # get source nodata value
-    no_data = src_band.GetNoDataValue()
-
-    # read in source array
-    src_ar = src_band.ReadAsArray()
-
-    # create target dataset
-    drv = gdal.GetDriverByName("GTiff")
-    trg_ds = drv.Create(
-        output_scene, 
-        src_ds.RasterXSize, 
-        src_ds.RasterYSize, 
-        1, 
-        gdal.GDT_Float32
-    )
-
-    # set target metadata
-    trg_ds.SetGeoTransform(src_ds.GetGeoTransform())
-    trg_ds.SetProjection(src_ds.GetProjection())
-
-    # get target band
-    trg_band = trg_ds.GetRasterBand(1)
-
-    # set target nodata value
-    trg_band.SetNoDataValue(no_data)
-
     # convert to radiance
-    trg_ar = gain * src_ar + bias
-    trg_ar[src_ar == no_data] = no_data
-
-    # write radiance to band
-    trg_band.WriteArray(trg_ar)
-
-    # close handles
-    trg_ds.FlushCache()
-    trg_ds = None
-    trg_band = None
-    src_ds = None
-    src_band = None
+    _scale_band(input_scene, output_scene, gain, bias)
 
 
 def toa_reflectance(input_scene, gain, bias, output_scene):
@@ -85,8 +42,9 @@ def toa_reflectance(input_scene, gain, bias, output_scene):
 
     Params
     ------
-    input_scene : str
-        File path to Landsat scene (.TIF)
+    input_scene : str or osgeo.gdal.Dataset
+        File path to Landsat scene (.TIF), or an open dataset 
+        backed by a file, which is reopened by name.
     
     gain : float
         Band specific rescaling gain factor (multiplicative).
@@ -103,53 +61,8 @@ def toa_reflectance(input_scene, gain, bias, output_scene):
     None
     """
 
-    # ensure output does not already exist
-    if os.path.exists(output_scene):
-        raise ValueError(f"{output_scene} already exists!")
-    
-    # open source dataset
-    src_ds = gdal.Open(input_scene)
-    src_band = src_ds.GetRasterBand(1)
-
-    # get source nodata value
-    no_data = src_band.GetNoDataValue()
-
-    # read in source array
-    src_ar = src_band.ReadAsArray()
-
-    # create target dataset
-    drv = gdal.GetDriverByName("GTiff")
-    trg_ds = drv.Create(
-        output_scene, 
-        src_ds.RasterXSize, 
-        src_ds.RasterYSize, 
-        1, 
-        gdal.GDT_Float32
-    )
-
-    # set target metadata
-    trg_ds.SetGeoTransform(src_ds.GetGeoTransform())
-    trg_ds.SetProjection(src_ds.GetProjection())
-
-    # get target band
-    trg_band = trg_ds.GetRasterBand(1)
-
-    # set target nodata value
-    trg_band.SetNoDataValue(no_data)
-
     # convert to relectance
-    trg_ar = gain * src_ar + bias
-    trg_ar[src_ar == no_data] = no_data
-
-    # write radiance to band
-    trg_band.WriteArray(trg_ar)
-
-    # close handles
-    trg_ds.FlushCache()
-    trg_ds = None
-    trg_band = None
-    src_ds = None
-    src_band = None
+    _scale_band(input_scene, output_scene, gain, bias)
 
 
 def toa_brightness(input_scene, k1, k2, output_scene):
@@ -160,8 +73,8 @@ def toa_brightness(input_scene, k1, k2, output_scene):
 
     Params
     ------
-    input_scene : str
-        File path to Landsat scene (.TIF)
+    input_scene : str or osgeo.gdal.Dataset
+        File path to Landsat scene (.TIF), or an open dataset.
     
     k1 : float
         Band specific calibration constant 1 (Kelvin).
@@ -178,50 +91,42 @@ def toa_brightness(input_scene, k1, k2, output_scene):
     None
     """
 
-    # ensure output does not already exist
-    if os.path.exists(output_scene):
-        raise ValueError(f"{output_scene} already exists!")
-    
-    # open source dataset
-    src_ds = gdal.Open(input_scene)
-    src_band = src_ds.GetRasterBand(1)
+    # convert to brightness
+    k1, k2 = np.float32(k1), np.float32(k2)
+
+    def kernel(src_ar, no_data, trg_ar):
+        _bright_kernel(src_ar, np.float32(1), np.float32(0), k1, k2, no_data, trg_ar)
 
-    # get source nodata value
-    no_data = src_band.GetNoDataValue()
+    _map_band(input_scene, output_scene, kernel)
 
-    # read in source array
-    src_ar = src_band.ReadAsArray()
 
-    # create target dataset
-    drv = gdal.GetDriverByName("GTiff")
-    trg_ds = drv.Create(
-        output_scene, 
-        src_ds.RasterXSize, 
-        src_ds.RasterYSize, 
-        1, 
-        gdal.GDT_Float32
-    )
+def toa_radiance_scene(input_scene, band_params, output_scene):
 
-    # set target metadata
-    trg_ds.SetGeoTransform(src_ds.GetGeoTransform())
-    trg_ds.SetProjection(src_ds.GetProjection())
+    """
+    Function to convert digtial numbers to TOA radiance for several 
+    bands of a multiband Landsat scene at once. All bands are
+    converted in one GDAL pass and written to a single multiband 
+    scene.
 
-    # get target band
-    trg_band = trg_ds.GetRasterBand(1)
+    Params
+    ------
+    input_scene : str or osgeo.gdal.Dataset
+        File path to multiband Landsat scene (.TIF), or an open 
+        dataset backed by a file, which is reopened by name.
 
-    # set target nodata value
-    trg_band.SetNoDataValue(no_data)
+    band_params : dict
+        Maps band number to a (gain, bias) tuple of band specific 
+        rescaling factors. Output bands follow the order of the 
+        dict.
 
-    # convert to brightness
-    trg_ar = k2 / np.log((k1 / src_ar) + 1)
-    trg_ar[src_ar == no_data] = no_data
-
-    # write radiance to band
-    trg_band.WriteArray(trg_ar)
-
-    # close handles
-    trg_ds.FlushCache()
-    trg_ds = None
-    trg_band = None
-    src_ds = None
-    src_band = None
\ No newline at end of file
+    output_scene : str
+        File path to output scene (.TIF). File must not already 
+        exist.
+
+    Returns
+    -------
+    None
+    """
+
+    # convert to radiance
+    _scale_bands(input_scene, output_scene, band_params)